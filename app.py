@@ -1,7 +1,11 @@
 import os
 import json
 import uuid
-from datetime import datetime
+import bisect
+import base64
+import itertools
+import threading
+from datetime import date, datetime, time
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_file
 from werkzeug.security import generate_password_hash, check_password_hash
 from openpyxl import Workbook
@@ -23,6 +27,234 @@ def save_users(users):
     with open(USERS_FILE, 'w') as f:
         json.dump(users, f, indent=2)
 
+def users_file_mtime():
+    try:
+        return os.stat(USERS_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+# Sorts after any character, used as the upper bound of a prefix range
+PREFIX_END = chr(0x10FFFF)
+
+def username_key(user_data):
+    return str(user_data.get('username', '')).lower()
+
+def created_key(user_data):
+    created_at = user_data.get('created_at', '')
+    return created_at if isinstance(created_at, str) else ''
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+def decode_cursor(raw):
+    """Turn an opaque next_cursor back into a sort key, raising ValueError if malformed"""
+    key = json.loads(base64.urlsafe_b64decode(raw.encode()))
+    if not isinstance(key, list):
+        raise ValueError('Invalid cursor')
+    return tuple(key)
+
+class ParticipantIndex:
+    """In-memory sorted indexes over the user store for the participant directory.
+
+    Built from users.json on first use and kept up to date by /register, so
+    lookups are binary searches instead of full scans. Edits made to
+    users.json outside /register are picked up on the next query by
+    comparing the file's mtime and rebuilding.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.mtime = None
+        self.users = {}
+        self.npm_index = []          # sorted NPMs
+        self.created_index = []      # sorted (created_at, npm)
+        self.created_keys = []       # created_at values, parallel to created_index
+        self.username_index = []     # sorted (lowercased username, npm)
+
+    def _ensure_loaded(self):
+        mtime = users_file_mtime()
+        if self.loaded and mtime == self.mtime:
+            return
+        # Collect everything and sort once, O(n log n), rather than paying an
+        # O(n) list insert per user
+        users = load_users()
+        npm_index = sorted(users)
+        created_index = sorted((created_key(user_data), npm) for npm, user_data in users.items())
+        username_index = sorted((username_key(user_data), npm) for npm, user_data in users.items())
+
+        self.users = users
+        self.npm_index = npm_index
+        self.created_index = created_index
+        self.created_keys = [created_at for created_at, _ in created_index]
+        self.username_index = username_index
+        self.mtime = mtime
+        self.loaded = True
+
+    def _insert(self, npm, user_data):
+        if npm in self.users:
+            return
+
+        # Work out every key and position first so a bad record leaves the
+        # indexes untouched instead of half-updated
+        created_at = created_key(user_data)
+        created_entry = (created_at, npm)
+        username_entry = (username_key(user_data), npm)
+
+        npm_pos = bisect.bisect(self.npm_index, npm)
+        created_pos = bisect.bisect(self.created_index, created_entry)
+        username_pos = bisect.bisect(self.username_index, username_entry)
+
+        self.npm_index.insert(npm_pos, npm)
+        self.created_index.insert(created_pos, created_entry)
+        self.created_keys.insert(created_pos, created_at)
+        self.username_index.insert(username_pos, username_entry)
+        self.users[npm] = user_data
+
+    def save(self, users, npm):
+        """Write users.json with the newly registered npm and index it.
+
+        Callers hold self.lock from load_users() onwards, so the mtime
+        recorded here belongs to this write and not to some other change.
+        """
+        with self.lock:
+            previous_mtime = users_file_mtime()
+            save_users(users)
+            # Only patch the index if it matched the file before this write,
+            # otherwise leave the old mtime so the next query rebuilds
+            if self.loaded and previous_mtime == self.mtime:
+                self._insert(npm, users[npm])
+                self.mtime = users_file_mtime()
+
+    def _prefix_ranges(self, q):
+        """Return the npm_index and username_index slices that start with q"""
+        q_lower = q.lower()
+        npm_range = (
+            bisect.bisect_left(self.npm_index, q),
+            bisect.bisect_left(self.npm_index, q + PREFIX_END)
+        )
+        username_range = (
+            bisect.bisect_left(self.username_index, (q_lower,)),
+            bisect.bisect_left(self.username_index, (q_lower + PREFIX_END,))
+        )
+        return npm_range, username_range
+
+    def _prefix_key(self, npm, q, q_lower):
+        """Return the sort key npm has in a search for q, or None if it doesn't match"""
+        if npm.startswith(q):
+            return (0, npm)
+        name = username_key(self.users[npm])
+        if name.startswith(q_lower):
+            return (1, name, npm)
+        return None
+
+    def _prefix_rows(self, q, npm_range, username_range, cursor):
+        """Yield (key, npm) for the prefix matches after cursor, in result order.
+
+        NPM matches come first in NPM order, keyed (0, npm), then username
+        matches in username order, keyed (1, username, npm). A user matching
+        on both is only listed once, under its NPM.
+        """
+        npm_lo, npm_hi = npm_range
+        username_lo, username_hi = username_range
+        if cursor is None or cursor[0] == 0:
+            if cursor is not None:
+                npm_lo = bisect.bisect_right(self.npm_index, cursor[1], npm_lo, npm_hi)
+            for i in range(npm_lo, npm_hi):
+                npm = self.npm_index[i]
+                yield (0, npm), npm
+        else:
+            username_lo = bisect.bisect_right(self.username_index, cursor[1:], username_lo, username_hi)
+        for i in range(username_lo, username_hi):
+            name, npm = self.username_index[i]
+            if not npm.startswith(q):
+                yield (1, name, npm), npm
+
+    def _in_window(self, npm, date_from, date_to):
+        created_at = created_key(self.users[npm])
+        return ((date_from is None or created_at >= date_from) and
+                (date_to is None or created_at <= date_to))
+
+    @staticmethod
+    def _check_cursor(cursor, q):
+        if cursor is None:
+            return
+        if q:
+            valid = (
+                (len(cursor) == 2 and cursor[0] == 0 and isinstance(cursor[1], str)) or
+                (len(cursor) == 3 and cursor[0] == 1 and all(isinstance(part, str) for part in cursor[1:]))
+            )
+        else:
+            valid = len(cursor) == 2 and all(isinstance(part, str) for part in cursor)
+        if not valid:
+            raise ValueError('Invalid cursor')
+
+    def query(self, q='', date_from=None, date_to=None, cursor=None, limit=20):
+        """Return (participants, next_cursor) for one page of the directory.
+
+        date_from/date_to are inclusive ISO bounds on created_at and cursor is
+        the key of the last row of the previous page, as given by
+        decode_cursor.
+
+        Without q, rows come in registration order and a page costs
+        O(log n + limit). With q, rows come in NPM order and then username
+        order (see _prefix_rows), which costs O(log n + limit) per page. The
+        only extra cost is users whose NPM and username both start with q.
+        They are skipped once, when paging moves on to username matches. With
+        both q and a date window, a page reads at most the smaller of the m
+        prefix matches and the w rows in the window, so it costs
+        O(log n + min(m, w log w)).
+        """
+        self._check_cursor(cursor, q)
+
+        with self.lock:
+            self._ensure_loaded()
+
+            lo = 0 if date_from is None else bisect.bisect_left(self.created_keys, date_from)
+            hi = len(self.created_keys) if date_to is None else bisect.bisect_right(self.created_keys, date_to)
+
+            if not q:
+                if cursor is not None:
+                    lo = bisect.bisect_right(self.created_index, cursor, lo, hi)
+                rows = [(entry, entry[1]) for entry in self.created_index[lo:min(lo + limit + 1, hi)]]
+            else:
+                npm_range, username_range = self._prefix_ranges(q)
+                match_count = (npm_range[1] - npm_range[0]) + (username_range[1] - username_range[0])
+                if hi - lo < match_count:
+                    # Fewer rows in the date window than matches: filter the
+                    # window and sort what is left
+                    q_lower = q.lower()
+                    keyed = ((self._prefix_key(npm, q, q_lower), npm) for _, npm in self.created_index[lo:hi])
+                    rows = sorted(
+                        (key, npm) for key, npm in keyed
+                        if key is not None and (cursor is None or key > cursor)
+                    )[:limit + 1]
+                else:
+                    rows = list(itertools.islice(
+                        (
+                            (key, npm) for key, npm in self._prefix_rows(q, npm_range, username_range, cursor)
+                            if self._in_window(npm, date_from, date_to)
+                        ),
+                        limit + 1
+                    ))
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            participants = []
+            for _, npm in rows:
+                user_data = self.users[npm]
+                participants.append({
+                    'npm': npm,
+                    'username': user_data.get('username', 'Unknown'),
+                    'created_at': created_key(user_data)
+                })
+
+        next_cursor = encode_cursor(rows[-1][0]) if has_more else None
+        return participants, next_cursor
+
+participant_index = ParticipantIndex()
+
 class GameState:
     def __init__(self, user_id=None):
         self.player = {
@@ -233,19 +465,25 @@ def register():
         if not username or not npm:
             return jsonify({'success': False, 'message': 'Username and NPM are required'})
         
-        users = load_users()
-        
-        if npm in users:
-            return jsonify({'success': False, 'message': 'NPM already registered'})
-        
-        # Store user data (in production, hash the NPM)
-        users[npm] = {
-            'username': username,
-            'npm': npm,
-            'created_at': datetime.now().isoformat()
-        }
+        if not isinstance(username, str) or not isinstance(npm, str):
+            return jsonify({'success': False, 'message': 'Username and NPM must be text'})
         
-        save_users(users)
+        # Hold the index lock across read and write so the index sees this
+        # registration as its own change to users.json
+        with participant_index.lock:
+            users = load_users()
+            
+            if npm in users:
+                return jsonify({'success': False, 'message': 'NPM already registered'})
+            
+            # Store user data (in production, hash the NPM)
+            users[npm] = {
+                'username': username,
+                'npm': npm,
+                'created_at': datetime.now().isoformat()
+            }
+            
+            participant_index.save(users, npm)
         
         return jsonify({'success': True, 'message': 'Registration successful. You can now login.'})
     
@@ -568,6 +806,53 @@ def restart_game():
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to restart game: {str(e)}'})
 
+def parse_date_bound(value, end_of_day=False):
+    """Normalize a from/to query value into a created_at comparison key"""
+    if not value:
+        return None
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        day = None
+    if day is not None:
+        if end_of_day:
+            return datetime.combine(day, time.max).isoformat()
+        return day.isoformat()
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        # created_at is naive local time, so compare in the same terms
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt.isoformat()
+
+@app.route('/api/participants')
+def list_participants():
+    """Search and page through registered participants"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not authenticated'}), 401
+    
+    q = request.args.get('q', '').strip()
+
+    try:
+        date_from = parse_date_bound(request.args.get('from'))
+        date_to = parse_date_bound(request.args.get('to'), end_of_day=True)
+    except ValueError:
+        return jsonify({'error': 'Invalid date, use ISO format (YYYY-MM-DD)'}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    try:
+        raw_cursor = request.args.get('cursor')
+        cursor = decode_cursor(raw_cursor) if raw_cursor else None
+        participants, next_cursor = participant_index.query(q, date_from, date_to, cursor, limit)
+        return jsonify({'success': True, 'participants': participants, 'next_cursor': next_cursor})
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to list participants: {str(e)}'}), 500
+
 @app.route('/downloadlistofpeserta')
 def download_participant_list():
     """Download Excel file with list of registered participants"""
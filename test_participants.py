@@ -0,0 +1,213 @@
+import json
+import os
+import time
+
+import pytest
+
+
+USERS = {
+    '2023001': {'username': 'Alice', 'npm': '2023001', 'created_at': '2025-08-01T09:00:00'},
+    '2023002': {'username': 'bob', 'npm': '2023002', 'created_at': '2025-08-01T23:30:00.250000'},
+    '2023003': {'username': 'Alan', 'npm': '2023003', 'created_at': '2025-08-02T00:00:00'},
+    '2024001': {'username': 'carol', 'npm': '2024001', 'created_at': '2025-08-02T12:00:00'},
+    '2124001': {'username': 'dave', 'npm': '2124001', 'created_at': '2025-08-03T08:00:00'},
+}
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import app
+
+    users_file = tmp_path / 'users.json'
+    users_file.write_text(json.dumps(USERS))
+    monkeypatch.setattr(app, 'USERS_FILE', str(users_file))
+    monkeypatch.setattr(app, 'participant_index', app.ParticipantIndex())
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = '2023001'
+    return client
+
+
+def fetch_all(client, query, limit):
+    """Follow next_cursor until the last page and return the NPMs in order"""
+    npms = []
+    cursor = None
+    while True:
+        url = f'/api/participants?limit={limit}&{query}'
+        if cursor:
+            url += f'&cursor={cursor}'
+        data = client.get(url).get_json()
+        assert data['success']
+        assert len(data['participants']) <= limit
+        npms.extend(p['npm'] for p in data['participants'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            return npms
+
+
+def test_lists_in_registration_order(client):
+    data = client.get('/api/participants').get_json()
+    assert [p['npm'] for p in data['participants']] == list(USERS)
+    assert data['next_cursor'] is None
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4, 5])
+def test_cursor_crosses_page_boundaries(client, limit):
+    assert fetch_all(client, '', limit) == list(USERS)
+
+
+def test_npm_prefix_upper_bound(client):
+    assert fetch_all(client, 'q=2023', 10) == ['2023001', '2023002', '2023003']
+    assert fetch_all(client, 'q=20', 10) == ['2023001', '2023002', '2023003', '2024001']
+
+
+def test_username_prefix_is_case_insensitive(client):
+    # Username matches come back in username order: alan before alice
+    assert fetch_all(client, 'q=AL', 10) == ['2023003', '2023001']
+    assert fetch_all(client, 'q=AL', 1) == ['2023003', '2023001']
+    assert fetch_all(client, 'q=ob', 10) == []
+
+
+def test_prefix_search_combined_with_date_window(client):
+    # Four matches against a window of three rows filters the window
+    assert fetch_all(client, 'q=20&from=2025-08-02', 1) == ['2023003', '2024001']
+    # Three matches against a window of four rows walks the matches
+    assert fetch_all(client, 'q=2023&from=2025-08-01T12:00', 1) == ['2023002', '2023003']
+
+
+def test_prefix_search_lists_npm_then_username_matches_once(client, app_module):
+    users = dict(USERS)
+    users['2023005'] = {'username': '2023005', 'npm': '2023005', 'created_at': '2025-08-04T08:00:00'}
+    users['3000001'] = {'username': '2023fan', 'npm': '3000001', 'created_at': '2025-08-01T08:00:00'}
+    write_users_externally(app_module, users)
+    expected = ['2023001', '2023002', '2023003', '2023005', '3000001']
+    for limit in (1, 2, 4, 10):
+        assert fetch_all(client, 'q=2023', limit) == expected
+
+
+@pytest.fixture
+def cohorts(app_module, monkeypatch):
+    """2000 users where the 2023 cohort registered before the 2024 cohort.
+
+    Returns a counter of per-row key lookups, so tests can bound how much of
+    the store a query reads.
+    """
+    users = {}
+    for cohort, month in (('2023', '08'), ('2024', '09')):
+        for i in range(1000):
+            npm = f'{cohort}{i:04d}'
+            created_at = f'2025-{month}-01T{i // 60 % 24:02d}:{i % 60:02d}:00'
+            users[npm] = {'username': f'user{npm}', 'npm': npm, 'created_at': created_at}
+    write_users_externally(app_module, users)
+    app_module.participant_index.query()
+
+    lookups = {'count': 0}
+    for name in ('created_key', 'username_key'):
+        original = getattr(app_module, name)
+
+        def counted(user_data, original=original):
+            lookups['count'] += 1
+            return original(user_data)
+
+        monkeypatch.setattr(app_module, name, counted)
+    return lookups
+
+
+def test_prefix_search_aligned_with_registration_date_reads_one_page(app_module, cohorts):
+    participants, cursor = app_module.participant_index.query('2024', limit=20)
+    assert [p['npm'] for p in participants] == [f'2024{i:04d}' for i in range(20)]
+    participants, _ = app_module.participant_index.query('2024', cursor=app_module.decode_cursor(cursor), limit=20)
+    assert participants[0]['npm'] == '20240020'
+    assert cohorts['count'] <= 4 * 21
+
+
+def test_prefix_search_in_narrow_date_window_reads_the_window(app_module, cohorts):
+    # The last five 2024 registrations, searched with both cohorts
+    date_from = '2025-09-01T16:35:00'
+    participants, _ = app_module.participant_index.query('2024', date_from=date_from)
+    assert [p['npm'] for p in participants] == [f'2024{i:04d}' for i in range(995, 1000)]
+    participants, _ = app_module.participant_index.query('2023', date_from=date_from)
+    assert participants == []
+    assert cohorts['count'] <= 4 * 10
+
+
+def test_date_bounds_are_inclusive(client):
+    assert fetch_all(client, 'from=2025-08-01&to=2025-08-01', 10) == ['2023001', '2023002']
+    assert fetch_all(client, 'to=20250801', 10) == ['2023001', '2023002']
+    assert fetch_all(client, 'from=2025-08-02T00:00:00&to=2025-08-02T12:00:00', 10) == ['2023003', '2024001']
+
+
+@pytest.fixture
+def jakarta_time(monkeypatch):
+    with monkeypatch.context() as m:
+        m.setenv('TZ', 'Asia/Jakarta')
+        time.tzset()
+        yield
+    time.tzset()
+
+
+@pytest.mark.skipif(not hasattr(time, 'tzset'), reason='needs time.tzset')
+def test_timezone_bound_is_converted_to_local_time(app_module, jakarta_time):
+    assert app_module.parse_date_bound('2025-08-02T00:00:00+00:00') == '2025-08-02T07:00:00'
+    assert app_module.parse_date_bound('2025-08-02T09:30:00+09:00') == '2025-08-02T07:30:00'
+
+
+def test_requires_login(app_module):
+    response = app_module.app.test_client().get('/api/participants')
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize('query', ['from=yesterday', 'to=2025-13-01', 'limit=ten', 'cursor=nope'])
+def test_rejects_bad_parameters(client, query):
+    assert client.get(f'/api/participants?{query}').status_code == 400
+
+
+def test_register_updates_index(client):
+    client.get('/api/participants')
+    response = client.post('/register', json={'username': 'Zed', 'npm': '2023004'})
+    assert response.get_json()['success']
+    assert fetch_all(client, 'q=zed', 10) == ['2023004']
+    assert fetch_all(client, '', 10)[-1] == '2023004'
+
+
+@pytest.mark.parametrize('payload', [
+    {'username': 'Zed', 'npm': 12345},
+    {'username': 5, 'npm': '2023009'},
+])
+def test_register_rejects_non_string_fields(client, app_module, payload):
+    client.get('/api/participants')
+    data = client.post('/register', json=payload).get_json()
+    assert data == {'success': False, 'message': 'Username and NPM must be text'}
+    assert app_module.load_users() == USERS
+    assert fetch_all(client, '', 10) == list(USERS)
+
+
+def write_users_externally(app_module, users):
+    with open(app_module.USERS_FILE, 'w') as f:
+        json.dump(users, f)
+    # Make sure the mtime moves even on filesystems with coarse timestamps
+    stat = os.stat(app_module.USERS_FILE)
+    os.utime(app_module.USERS_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_reloads_after_external_edit(client, app_module):
+    client.get('/api/participants')
+    users = dict(USERS)
+    del users['2023002']
+    write_users_externally(app_module, users)
+    assert fetch_all(client, '', 10) == list(users)
+
+
+def test_external_edit_before_register_is_not_masked(client, app_module):
+    client.get('/api/participants')
+    users = dict(USERS)
+    del users['2023002']
+    write_users_externally(app_module, users)
+    assert client.post('/register', json={'username': 'Zed', 'npm': '2023004'}).get_json()['success']
+    assert fetch_all(client, '', 10) == list(users) + ['2023004']